@@ -9,9 +9,10 @@ def configure_logging():
     """
     
     # Processors for structlog
+    # filter_by_level runs first so events below the level are dropped before any other work
     processors = [
-        structlog.contextvars.merge_contextvars,
         structlog.stdlib.filter_by_level,
+        structlog.contextvars.merge_contextvars,
         structlog.processors.TimeStamper(fmt="iso"),
         structlog.stdlib.add_logger_name,
         structlog.stdlib.add_log_level,
@@ -4,7 +4,7 @@ Contains business logic for text analysis and audio generation
 """
 
 
-from .audio_engine import generate_segment_audio, generate_script_audio, VOICE_MAP, EMOTION_SETTINGS, VOICE_SAMPLES, get_enriched_voice_map, get_public_voice_groups, generate_cast_metadata
+from .audio_engine import generate_segment_audio, generate_script_audio, VOICE_MAP, EMOTION_SETTINGS, VOICE_SAMPLES, get_enriched_voice_map, get_public_voice_groups, generate_cast_metadata, is_chinese
 
 
 
@@ -25,7 +25,8 @@ __all__ = [
     "VOICE_SAMPLES",
     "get_enriched_voice_map",
     "get_public_voice_groups",
-    "generate_cast_metadata"
+    "generate_cast_metadata",
+    "is_chinese"
 ]
 
 
@@ -0,0 +1,175 @@
+
+"""
+Audio Cache Service
+Content-addressed on-disk cache for synthesized TTS audio, so identical
+(provider, voice, text, settings, pacing) requests skip the paid API call.
+"""
+
+import os
+import json
+import time
+import shutil
+import asyncio
+import hashlib
+import threading
+from pathlib import Path
+from uuid import uuid4
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+TTS_CACHE_DIR = Path(os.getenv("TTS_CACHE_DIR", Path(__file__).resolve().parent.parent.parent / "tts_cache"))
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_MB", "512")) * 1024 * 1024
+TTS_CACHE_ENABLED = os.getenv("TTS_CACHE_ENABLED", "1") != "0"
+TTS_CACHE_TMP_MAX_AGE = 3600 # seconds; older *.tmp staging files are leftovers from interrupted stores
+
+
+def make_cache_key(provider: str, voice_id: str, text: str, settings: dict = None, pacing: float = 1.0) -> str:
+    """
+    Build a stable cache key for a synthesis request.
+    Runs of whitespace in text are collapsed (they don't change the audio), so
+    trivially reformatted lines still hit the cache.
+    """
+    text = " ".join(text.split())
+    payload = json.dumps([provider, voice_id, text, settings, pacing], sort_keys=True, ensure_ascii=False)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _link_or_copy(src, dst):
+    """Hardlink src to dst (no data copy on the same filesystem), falling back to a copy."""
+    try:
+        os.link(src, dst)
+    except FileNotFoundError:
+        raise
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+class AudioCache:
+    """
+    Directory of <key>.mp3 files with LRU eviction (by mtime) once the total size exceeds max_bytes.
+    fetch/store do blocking file I/O (directory scans, copies across filesystems), so async
+    callers use fetch_async/store_async, which run them in the default executor.
+    """
+
+    def __init__(self, cache_dir: Path = TTS_CACHE_DIR, max_bytes: int = TTS_CACHE_MAX_BYTES, enabled: bool = TTS_CACHE_ENABLED):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._size = None # Total bytes on disk, computed lazily on first store
+        self._lock = threading.Lock() # Guards _size and eviction across executor threads
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.mp3"
+
+    def fetch(self, key: str, output_file: str) -> bool:
+        """
+        Materialize the cached audio for key at output_file.
+
+        Returns:
+            bool: True on cache hit, False otherwise
+        """
+        if not self.enabled:
+            return False
+
+        cached = self._path(key)
+        try:
+            _link_or_copy(cached, output_file)
+            os.utime(cached) # Mark as recently used
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            logger.warn("Failed to read TTS cache entry", key=key, error=str(e))
+            return False
+
+    def store(self, key: str, source_file: str):
+        """Add a freshly generated audio file to the cache."""
+        if not self.enabled or not os.path.exists(source_file):
+            return
+
+        try:
+            size = os.path.getsize(source_file)
+            if not size:
+                return
+
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            cached = self._path(key)
+
+            # Stage under a unique name, then atomically publish
+            tmp_path = self.cache_dir / f"{key}.{uuid4().hex}.tmp"
+            _link_or_copy(source_file, tmp_path)
+            os.replace(tmp_path, cached)
+        except OSError as e:
+            logger.warn("Failed to store TTS cache entry", key=key, error=str(e))
+            return
+
+        with self._lock:
+            if self._size is None:
+                self._remove_stale_tmp()
+                self._size = self._scan_size()
+            else:
+                self._size += size
+
+            if self._size > self.max_bytes:
+                self._evict()
+
+    async def fetch_async(self, key: str, output_file: str) -> bool:
+        """fetch() without blocking the event loop."""
+        if not self.enabled:
+            return False
+        return await asyncio.get_running_loop().run_in_executor(None, self.fetch, key, output_file)
+
+    async def store_async(self, key: str, source_file: str):
+        """store() without blocking the event loop."""
+        if not self.enabled:
+            return
+        await asyncio.get_running_loop().run_in_executor(None, self.store, key, source_file)
+
+    def _entries(self) -> list:
+        entries = []
+        for path in self.cache_dir.glob("*.mp3"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _remove_stale_tmp(self):
+        """Delete staging files left behind by stores that never reached os.replace."""
+        cutoff = time.time() - TTS_CACHE_TMP_MAX_AGE
+        for path in self.cache_dir.glob("*.tmp"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                continue
+
+    def _evict(self):
+        """Drop least recently used entries until the cache is back under 90% of max_bytes."""
+        self._remove_stale_tmp()
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+                total -= size
+                removed += 1
+            except OSError:
+                continue
+
+        self._size = total
+        logger.info("Evicted TTS cache entries", removed=removed, size_bytes=total)
+
+
+# Singleton instance
+audio_cache = AudioCache()
@@ -5,11 +5,22 @@ Generates audio using Hybrid Routing Strategy (Azure -> Google -> OpenAI -> Elev
 """
 
 import os
+import re
+import atexit
+import time
 import asyncio
 import json
+import tempfile
+import hashlib
+import zlib
+import functools
+import itertools
+from collections import defaultdict
+from collections.abc import Mapping
 from pathlib import Path
-from typing import Dict, Optional
-from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, Optional, Tuple
+from datetime import datetime, timedelta
 import structlog
 
 logger = structlog.get_logger(__name__)
@@ -21,6 +32,7 @@ from .tts_providers import (
     ElevenLabsTTSProvider,
     TTSProvider
 )
+from .audio_cache import audio_cache, make_cache_key
 
 # ============================================================================
 # CONSTANTS & CONFIGURATION
@@ -55,22 +67,164 @@ def load_avatar_map():
 
 _AVATAR_MAP = load_avatar_map()
 
+def _freeze(node):
+    """Recursively convert dicts to read-only MappingProxyType views and lists to tuples."""
+    if isinstance(node, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in node.items()})
+    if isinstance(node, list):
+        return tuple(_freeze(item) for item in node)
+    return node
+
 _CONFIG = load_voice_config()
 
-VOICE_MAP = _CONFIG.get("VOICE_MAP", {})
+# Static voice tables are frozen so they can be shared without defensive copies
+VOICE_MAP = _freeze(_CONFIG.get("VOICE_MAP", {}))
 EMOTION_SETTINGS = _CONFIG.get("EMOTION_SETTINGS", {})
 VOICE_SAMPLES = _CONFIG.get("VOICE_SAMPLES", {})
-VOICE_LABELS = _CONFIG.get("VOICE_LABELS", {})
+VOICE_LABELS = _freeze(_CONFIG.get("VOICE_LABELS", {}))
 AZURE_MONTHLY_LIMIT = _CONFIG.get("AZURE_MONTHLY_LIMIT", 500000)
 USAGE_FILE = Path(__file__).resolve().parent.parent.parent / "tts_usage.json"
+USAGE_FLUSH_THRESHOLD = 5000 # Unflushed Azure chars before tts_usage.json is rewritten
+USAGE_FLUSH_INTERVAL = 5.0 # Max seconds pending usage stays unflushed (checked on increment)
+
+# Max in-flight TTS requests per provider (override per account tier, e.g. TTS_ELEVENLABS_CONCURRENCY=10)
+PROVIDER_CONCURRENCY = {
+    name: int(os.getenv(f"TTS_{name.upper()}_CONCURRENCY", default))
+    for name, default in {
+        "elevenlabs": 3,
+        "openai": 5,
+        "google": 10,
+        "azure": 20
+    }.items()
+}
+
+# Optional requests-per-minute cap per provider (0 = unlimited), e.g. TTS_ELEVENLABS_RPM=100
+PROVIDER_RATE_LIMITS = {
+    name: int(os.getenv(f"TTS_{name.upper()}_RPM", "0")) for name in PROVIDER_CONCURRENCY
+}
+
+# Opt-in round-robin voice assignment (TTS_VOICE_ROUND_ROBIN=1): distinct pool voices within a
+# script, at the cost of a character's voice depending on who else is in that script.
+# Off by default, so each character keeps the voice derived from its name hash.
+VOICE_ROUND_ROBIN = os.getenv("TTS_VOICE_ROUND_ROBIN", "0") == "1"
+
+# Routes that don't depend on provider state or quota, resolved with one dict probe
+_FIXED_ROUTES = {
+    ("dialogue", "vip"): "elevenlabs",
+    ("dialogue", "free"): "google",
+}
+
+# Provider health: EWMA weight per sample, error rate above which a provider is
+# skipped by select_provider, and how long after its last error the skip lasts
+PROVIDER_EWMA_ALPHA = 0.1
+PROVIDER_MAX_ERROR_RATE = 0.5
+PROVIDER_ERROR_COOLDOWN = 60.0 # seconds
+
+# Sequence for segment audio filenames (unique per process, unlike millisecond timestamps)
+_segment_counter = itertools.count()
+
+# CJK Unified Ideographs (used for zh/en language detection)
+_CJK_RE = re.compile(r'[\u4e00-\u9fff]')
+
+def is_chinese(text: str) -> bool:
+    """Return True if text contains any CJK Unified Ideograph."""
+    # str.isascii() is O(1) in CPython; pure-ASCII text cannot contain CJK
+    if text.isascii():
+        return False
+    return _CJK_RE.search(text) is not None
+
+def _detect_lang_key(text: str) -> str:
+    """Return the VOICE_MAP language key ("zh" or "en") for text."""
+    return "zh" if is_chinese(text) else "en"
+
+def _build_voice_provider_index() -> Dict[str, str]:
+    """
+    Walk VOICE_MAP once and map every raw voice ID to the provider that owns it.
+    """
+    index = {}
+
+    def collect(node, provider_name):
+        if isinstance(node, str):
+            index.setdefault(node, provider_name)
+        elif isinstance(node, Mapping):
+            for value in node.values():
+                collect(value, provider_name)
+        elif isinstance(node, tuple):
+            for item in node:
+                collect(item, provider_name)
+
+    for provider, data in VOICE_MAP.items():
+        collect(data, provider)
+
+    return index
+
+# Inverted index: voice_id -> provider (e.g. "onyx" -> "openai")
+VOICE_ID_TO_PROVIDER = _build_voice_provider_index()
+
+# Precomputed membership sets for provider resolution
+_PROVIDER_SET = frozenset(("google", "azure", "openai", "elevenlabs"))
+_OPENAI_VOICE_SET = frozenset(VOICE_MAP.get("openai", {}).values()) | {"onyx", "alloy", "shimmer", "echo", "fable", "nova"}
+_AZURE_VOICE_SET = frozenset(VOICE_MAP.get("azure", {}).values()) | {"en-US-BrianNeural", "zh-CN-YunxiNeural"}
+
+# Flattened voice pools for hash-based assignment (one probe instead of a lookup chain)
+# Pools are tuples: immutable, so they can be shared without copying
+_GOOGLE_POOL = {
+    (lang, gender): tuple(voices)
+    for lang, by_gender in VOICE_MAP.get("google", {}).get("pool", {}).items()
+    for gender, voices in by_gender.items()
+}
+_GOOGLE_POOL_LANGS = frozenset(lang for lang, _ in _GOOGLE_POOL)
+_EL_POOL = {gender: tuple(voices) for gender, voices in VOICE_MAP.get("elevenlabs", {}).get("pool", {}).items()}
+_AZURE_DEFAULT = dict(VOICE_MAP.get("azure", {}))
+# Google default voice per language when the requested gender has none (first listed)
+_GOOGLE_FALLBACK = {
+    lang: next(iter(by_gender.values()))
+    for lang, by_gender in VOICE_MAP.get("google", {}).items()
+    if lang != "pool" and by_gender
+}
+_OPENAI_VOICE = dict(VOICE_MAP.get("openai", {})) # gender -> voice (non-male genders use "female")
+
+def _resolve_provider(voice_id: str) -> Optional[str]:
+    """
+    Resolve the provider for a raw voice ID.
+    Uses the VOICE_MAP index first, then pattern heuristics for IDs outside the config.
+    Returns None if the provider cannot be determined.
+    """
+    provider = VOICE_ID_TO_PROVIDER.get(voice_id)
+    if provider:
+        return provider
+    if voice_id in _OPENAI_VOICE_SET:
+        return "openai"
+    if voice_id in _AZURE_VOICE_SET:
+        return "azure"
+    if "Neural2" in voice_id or "Wavenet" in voice_id:
+        return "google"
+    if "Neural" in voice_id: # Azure usually ends in Neural
+        return "azure"
+    if len(voice_id) > 15: # ElevenLabs IDs are ~20 chars
+        return "elevenlabs"
+    return None
+
+def _parse_voice_id(voice_id: str) -> Tuple[Optional[str], str]:
+    """
+    Split a voice ID into (provider, raw_voice_id).
+    Namespaced IDs (e.g. google:en-US-Neural2-A, as produced by assign_voices_to_script)
+    short-circuit on their prefix; anything else goes through _resolve_provider.
+    """
+    if ":" in voice_id:
+        prefix, raw_id = voice_id.split(":", 1)
+        # Basic validation to ensure it looks like a provider
+        if prefix in _PROVIDER_SET:
+            return prefix, raw_id
+    return _resolve_provider(voice_id), voice_id
 
+@functools.lru_cache(maxsize=1)
 def get_enriched_voice_map() -> Dict:
     """
     Return a copy of VOICE_MAP where every voice ID is 
     replaced with {"id": "...", "name": "...", "provider": "..."}.
+    The result is cached (VOICE_MAP is static), so callers must treat it as read-only.
     """
-    import copy
-    
     def enrich_node(node, provider_name):
         if isinstance(node, str):
             # It's a voice ID (leaf)
@@ -80,17 +234,15 @@ def get_enriched_voice_map() -> Dict:
                 "avatar_url": _AVATAR_MAP.get(node) # Inject Avatar URL
                 # "provider": provider_name # Removed as per request
             }
-        elif isinstance(node, dict):
+        elif isinstance(node, Mapping):
             return {k: enrich_node(v, provider_name) for k, v in node.items()}
-        elif isinstance(node, list):
+        elif isinstance(node, tuple):
             return [enrich_node(item, provider_name) for item in node]
         return node
 
-    # Deep copy to avoid mutating the original CONFIGURATION
-    raw_map = copy.deepcopy(VOICE_MAP)
-    
+    # enrich_node builds new containers as it walks, so the original CONFIGURATION is never mutated
     enriched_map = {}
-    for provider, data in raw_map.items():
+    for provider, data in VOICE_MAP.items():
         enriched_map[provider] = enrich_node(data, provider)
         
     return enriched_map
@@ -105,6 +257,21 @@ def get_public_voice_groups(languages: list = None) -> Dict:
                   If None, returns all (or default behavior).
                   The caller handles default fallback.
     """
+    return _build_public_voice_groups(tuple(languages) if languages else None)
+
+def _exclude_default_voice(voices: list, default_voice) -> list:
+    """Drop the provider's default voice from a pool listing."""
+    if default_voice and isinstance(default_voice, dict) and "id" in default_voice:
+        target_id = default_voice["id"]
+        return [v for v in voices if v["id"] != target_id]
+    return voices
+
+@functools.lru_cache(maxsize=32)
+def _build_public_voice_groups(languages: Optional[tuple]) -> Dict:
+    """
+    Cached worker for get_public_voice_groups (languages must be hashable).
+    Never mutates the shared get_enriched_voice_map() result; new containers are built instead.
+    """
     full_map = get_enriched_voice_map()
     
     # Filter function for Google (Basic)
@@ -131,43 +298,29 @@ def get_public_voice_groups(languages: list = None) -> Dict:
                 
         return filtered
 
+    basic_voices = full_map.get("google")
+    advance_voices = full_map.get("elevenlabs")
+
     # Deduplicate Google Listing
-    if "google" in full_map and "pool" in full_map["google"]:
-        g_defaults = full_map["google"]
-        g_pool = full_map["google"]["pool"]
-        
-        for lang in g_pool:
-            if lang in g_defaults: # e.g. "en", "zh"
-                # Check Male
-                def_male = g_defaults[lang].get("male")
-                if def_male and isinstance(def_male, dict) and "id" in def_male:
-                    target_id = def_male["id"]
-                    if "male" in g_pool[lang]:
-                        g_pool[lang]["male"] = [v for v in g_pool[lang]["male"] if v["id"] != target_id]
-                        
-                # Check Female
-                def_female = g_defaults[lang].get("female")
-                if def_female and isinstance(def_female, dict) and "id" in def_female:
-                    target_id = def_female["id"]
-                    if "female" in g_pool[lang]:
-                        g_pool[lang]["female"] = [v for v in g_pool[lang]["female"] if v["id"] != target_id]
+    if basic_voices and "pool" in basic_voices:
+        g_pool = {}
+        for lang, lang_pool in basic_voices["pool"].items():
+            g_defaults = basic_voices.get(lang) or {} # e.g. "en", "zh"
+            g_pool[lang] = {
+                gender: _exclude_default_voice(voices, g_defaults.get(gender))
+                for gender, voices in lang_pool.items()
+            }
+        basic_voices = {**basic_voices, "pool": g_pool}
 
     # Deduplicate ElevenLabs Listing
-    if "elevenlabs" in full_map and "pool" in full_map["elevenlabs"]:
-        el_defaults = full_map["elevenlabs"]
-        el_pool = full_map["elevenlabs"]["pool"]
-        
-        for gender in ["male", "female"]:
-            def_voice = el_defaults.get(gender)
-            if def_voice and isinstance(def_voice, dict) and "id" in def_voice:
-                target_id = def_voice["id"]
-                if gender in el_pool:
-                     el_pool[gender] = [v for v in el_pool[gender] if v["id"] != target_id]
+    if advance_voices and "pool" in advance_voices:
+        el_pool = {
+            gender: _exclude_default_voice(voices, advance_voices.get(gender))
+            for gender, voices in advance_voices["pool"].items()
+        }
+        advance_voices = {**advance_voices, "pool": el_pool}
 
     # Apply Code Filtering
-    basic_voices = full_map.get("google")
-    advance_voices = full_map.get("elevenlabs")
-    
     if languages:
         basic_voices = filter_basic(basic_voices, languages)
         
@@ -192,20 +345,16 @@ def generate_cast_metadata(script: list, user_tier: str = "free") -> list:
     Includes DIALOGUE characters AND Narrator.
     """
     cast_map = {} # character -> {voice_info}
-    import re
     
-    # Pre-check for Narration
-    has_narration = any(s["type"] == "narration" for s in script)
-    narration_voice_info = None
+    # Pre-check for Narration (one pass finds both whether and where it starts)
+    first_narration = next((s for s in script if s["type"] == "narration"), None)
     
-    if has_narration:
+    if first_narration is not None:
         # Determine Narrator Voice
-        # 1. Find the first narration segment to detect language
-        first_narration = next((s for s in script if s["type"] == "narration"), None)
-        text_sample = first_narration["text"] if first_narration else ""
+        # 1. Use the first narration segment to detect language
+        text_sample = first_narration["text"]
         
-        is_chinese = bool(re.search(r'[\u4e00-\u9fff]', text_sample))
-        lang_key = "zh" if is_chinese else "en"
+        lang_key = _detect_lang_key(text_sample)
         
         # Check for Manual Voice Override (Narrator)
         manual_voice = first_narration.get("voice_id") # Changed from 'voice'
@@ -217,17 +366,8 @@ def generate_cast_metadata(script: list, user_tier: str = "free") -> list:
 
 
              
-             # Resolve Provider from ID (Simplified heuristic)
-             if voice_id in list(VOICE_MAP["openai"].values()):
-                 narration_provider = "openai"
-             elif voice_id in list(VOICE_MAP["azure"].values()) or voice_id in ["en-US-BrianNeural", "zh-CN-YunxiNeural"]:
-                 narration_provider = "azure"
-             elif "Neural2" in voice_id or "Wavenet" in voice_id:
-                 narration_provider = "google"
-             elif len(voice_id) > 15:
-                 narration_provider = "elevenlabs"
-             else:
-                 narration_provider = "unknown"
+             # Resolve Provider from ID (namespaced prefix, then index/heuristics)
+             narration_provider = _parse_voice_id(voice_id)[0] or "unknown"
                  
         else:
             # Default Logic
@@ -238,12 +378,12 @@ def generate_cast_metadata(script: list, user_tier: str = "free") -> list:
             if user_tier == "vip":
                 # VIP Logic: Try OpenAI first
                  narration_provider = "openai"
-                 voice_id = VOICE_MAP["openai"]["male"] # Onyx
+                 voice_id = _OPENAI_VOICE["male"] # Onyx
             else:
                 # Free Logic: Try Azure first, fallback to Google
                 if tts_manager.providers["azure"].is_enabled:
                     narration_provider = "azure"
-                    voice_id = VOICE_MAP["azure"].get(lang_key, "en-US-BrianNeural")
+                    voice_id = _AZURE_DEFAULT.get(lang_key, "en-US-BrianNeural")
                 else:
                     # Fallback to Google
                     narration_provider = "google"
@@ -287,17 +427,8 @@ def generate_cast_metadata(script: list, user_tier: str = "free") -> list:
 
 
              
-             # Resolve Provider from ID (Simplified heuristic)
-             if voice_id in list(VOICE_MAP["openai"].values()):
-                 provider = "openai"
-             elif voice_id in list(VOICE_MAP["azure"].values()) or voice_id in ["en-US-BrianNeural", "zh-CN-YunxiNeural"]:
-                 provider = "azure"
-             elif "Neural2" in voice_id or "Wavenet" in voice_id:
-                 provider = "google"
-             elif len(voice_id) > 15:
-                 provider = "elevenlabs"
-             else:
-                 provider = "unknown"
+             # Resolve Provider from ID (namespaced prefix, then index/heuristics)
+             provider = _parse_voice_id(voice_id)[0] or "unknown"
                  
         else:
             # Default Logic
@@ -306,8 +437,7 @@ def generate_cast_metadata(script: list, user_tier: str = "free") -> list:
             provider = "elevenlabs" if user_tier == "vip" else "google"
             
             # Detect language (simplified per segment)
-            is_chinese = bool(re.search(r'[\u4e00-\u9fff]', segment["text"]))
-            lang_key = "zh" if is_chinese else "en"
+            lang_key = _detect_lang_key(segment["text"])
             
             # Get voice ID using the singleton manager's logic
             voice_id = tts_manager._get_consistent_voice(character, gender, provider, lang=lang_key)
@@ -328,97 +458,286 @@ def generate_cast_metadata(script: list, user_tier: str = "free") -> list:
         
     return list(cast_map.values())
 
+
+def _voice_pool(gender: str, provider: str, lang: str = "en") -> Tuple[str, ...]:
+    """Return the raw voice pool hash/round-robin assignment draws from (empty if not pool-based)."""
+    if provider == "elevenlabs":
+        return _EL_POOL.get(gender) or _EL_POOL.get("male", ())
+    if provider == "google":
+        # Default to English if lang not in map (e.g. unknown)
+        if lang not in _GOOGLE_POOL_LANGS:
+            lang = "en"
+        return _GOOGLE_POOL.get((lang, gender)) or _GOOGLE_POOL.get((lang, "male"), ())
+    return ()
+
+
+def assign_cast_voices(characters, pool: Tuple[str, ...]) -> Dict[str, str]:
+    """
+    Deterministic round-robin assignment of pool voices to characters.
+    Characters are ordered by name hash and take consecutive pool slots, starting at the
+    first one's hash slot, so the first len(pool) distinct characters never share a voice.
+    """
+    ordered = sorted(set(characters), key=lambda c: (zlib.crc32(c.encode("utf-8")), c))
+    if not pool or not ordered:
+        return {}
+    start = zlib.crc32(ordered[0].encode("utf-8")) % len(pool)
+    return {character: pool[(start + i) % len(pool)] for i, character in enumerate(ordered)}
+
+
+@functools.lru_cache(maxsize=1024)
+def _hashed_voice(character: str, gender: str, provider: str, lang: str = "en") -> Optional[str]:
+    """
+    Get the voice ID for a character based on their name hash (None if no voice applies).
+    Pure and deterministic, so results are memoized (the log line fires on cache miss only).
+    """
+    if provider == "openai":
+        return f"openai:{_OPENAI_VOICE['male' if gender == 'male' else 'female']}"
+    
+    # Support both Google and ElevenLabs pools
+    target_pool = _voice_pool(gender, provider, lang)
+
+    if not target_pool:
+        # Fallback for Azure or if pool not found
+        # Azure logic is simple (one voice per lang)
+        if provider == "azure":
+             # Azure mapping is direct in VOICE_MAP['azure'][lang]
+             # Not pool-based
+             voice_id = _AZURE_DEFAULT.get(lang, "en-US-BrianNeural")
+             return f"azure:{voice_id}"
         
-    return list(cast_map.values())
+        # Generic fallback
+        return None
+
+    # Deterministic Logic (Hash)
+    # crc32 is stable across processes (unlike hash()) and much cheaper than md5
+    voice_index = zlib.crc32(character.encode("utf-8")) % len(target_pool)
+    selected_voice = target_pool[voice_index]
+    logger.debug("Voice assigned", character=character, gender=gender, provider=provider, voice=selected_voice, index=voice_index)
+    return f"{provider}:{selected_voice}"
+
+
+_month_cache = ("", 0.0) # (current "%Y-%m", epoch seconds when the next month starts)
+
+def _current_month() -> str:
+    """Local "%Y-%m", recomputed only once the next month has started."""
+    global _month_cache
+    month, rollover = _month_cache
+    if time.time() < rollover:
+        return month
+    
+    now = datetime.now()
+    next_month = (now.replace(day=28) + timedelta(days=4)).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    _month_cache = (now.strftime("%Y-%m"), next_month.timestamp())
+    return _month_cache[0]
+
+
+def _write_usage_file(usage: Dict):
+    """Atomically replace USAGE_FILE with usage (blocking)."""
+    usage_path = Path(USAGE_FILE)
+    data = json.dumps(usage, separators=(",", ":")).encode("utf-8")
+    fd, tmp_path = tempfile.mkstemp(dir=usage_path.parent, prefix=".tts_usage.", suffix=".tmp")
+    try:
+        try:
+            os.write(fd, data) # A few bytes: one write, no buffered file object
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, usage_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class _RateLimiter:
+    """
+    Token bucket allowing `rate` requests per `period` seconds (bursts up to `rate`),
+    so requests are paced below the provider's limit instead of retried after a 429.
+    """
+
+    def __init__(self, rate: int, period: float = 60.0):
+        self.rate = rate
+        self.period = period
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate / self.period)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * self.period / self.rate)
+
+
+class _LazyProviders(Mapping):
+    """
+    Provider registry that constructs each provider on first access,
+    so unused providers never pay their setup cost.
+    """
+
+    _factories = {
+        "azure": AzureTTSProvider,
+        "google": GoogleTTSProvider,
+        "openai": OpenAITTSProvider,
+        "elevenlabs": ElevenLabsTTSProvider
+    }
+
+    def __init__(self):
+        self._instances: Dict[str, TTSProvider] = {}
+
+    def __getitem__(self, name: str) -> TTSProvider:
+        provider = self._instances.get(name)
+        if provider is None:
+            provider = self._instances[name] = self._factories[name]()
+        return provider
+
+    def __iter__(self):
+        return iter(self._factories)
+
+    def __len__(self) -> int:
+        return len(self._factories)
 
 
 class TTSManager:
 
     def __init__(self):
-        self.providers = {
-            "azure": AzureTTSProvider(),
-            "google": GoogleTTSProvider(),
-            "openai": OpenAITTSProvider(),
-            "elevenlabs": ElevenLabsTTSProvider()
+        self.providers = _LazyProviders()
+        
+        # Per-provider concurrency limits (see PROVIDER_CONCURRENCY)
+        self._provider_semaphores = {
+            name: asyncio.Semaphore(limit) for name, limit in PROVIDER_CONCURRENCY.items()
+        }
+        # Request pacing for providers with a configured RPM (see PROVIDER_RATE_LIMITS)
+        self._provider_limiters = {
+            name: _RateLimiter(rpm) for name, rpm in PROVIDER_RATE_LIMITS.items() if rpm > 0
+        }
+        
+        # Azure usage is tracked in memory and flushed to USAGE_FILE in batches
+        self._usage_cache = self._load_usage()
+        self._dirty_chars = 0
+        self._last_flush = time.monotonic()
+        self._pending_flush: Optional[asyncio.Future] = None
+        atexit.register(self._flush_usage)
+        
+        # Cache keys currently being generated -> future resolved when done (single-flight)
+        self._pending_generations: Dict[str, asyncio.Future] = {}
+        
+        # Per-provider latency / error EWMAs, updated by generate()
+        self._metrics: Dict[str, Dict[str, float]] = {
+            name: {"latency_ewma": 0.0, "err_rate": 0.0, "last_error": 0.0} for name in PROVIDER_CONCURRENCY
+        }
+        
+        # provider name -> coroutine performing the actual synthesis
+        self._dispatch = {
+            "azure": self._gen_azure,
+            "google": self._gen_google,
+            "openai": self._gen_openai,
+            "elevenlabs": self._gen_elevenlabs,
         }
     
-    def _get_consistent_voice(self, character: str, gender: str, provider: str, lang: str = "en") -> str:
+    def _get_consistent_voice(self, character: str, gender: str, provider: str, lang: str = "en") -> Optional[str]:
         """
         Get a consistent voice ID/name for a character based on their name hash.
         """
-        if provider == "openai":
-            return f"openai:{VOICE_MAP['openai']['male']}" if gender == "male" else f"openai:{VOICE_MAP['openai']['female']}"
-        
-        # Support both Google and ElevenLabs pools
-        target_pool = None
-        
-        if provider == "elevenlabs":
-            target_pool = VOICE_MAP["elevenlabs"]["pool"].get(gender, VOICE_MAP["elevenlabs"]["pool"]["male"])
-        elif provider == "google":
-            # Default to English if lang not in map (e.g. unknown)
-            if lang not in VOICE_MAP["google"]["pool"]:
-                lang = "en"
-            
-            # Google pool structure: pool -> lang -> gender
-            lang_pool = VOICE_MAP["google"]["pool"].get(lang)
-            if lang_pool:
-                target_pool = lang_pool.get(gender, lang_pool.get("male"))
-
-        if not target_pool:
-            # Fallback for Azure or if pool not found
-            # Azure logic is simple (one voice per lang)
-            if provider == "azure":
-                 # Azure mapping is direct in VOICE_MAP['azure'][lang]
-                 # Not pool-based
-                 voice_id = VOICE_MAP["azure"].get(lang, "en-US-BrianNeural")
-                 return f"azure:{voice_id}"
-            
-            # Generic fallback
-            return None
-
-        # Deterministic Logic (Hash)
-        import hashlib
-        hash_obj = hashlib.md5(character.encode())
-        hash_int = int(hash_obj.hexdigest(), 16)
-        
-        voice_index = hash_int % len(target_pool)
-        selected_voice = target_pool[voice_index]
-        logger.info("Voice assigned", character=character, gender=gender, provider=provider, voice=selected_voice, index=voice_index)
-        return f"{provider}:{selected_voice}"
+        return _hashed_voice(character, gender, provider, lang)
         
-    def _get_monthly_usage(self) -> int:
+    def _load_usage(self) -> Dict:
         """Read current month's Azure usage from file."""
+        usage = {"month": _current_month(), "azure_usage": 0}
         if not os.path.exists(USAGE_FILE):
-            return 0
+            return usage
         
         try:
             with open(USAGE_FILE, 'r') as f:
                 data = json.load(f)
             
-            current_month = datetime.now().strftime("%Y-%m")
-            if data.get("month") != current_month:
-                return 0
-            return data.get("azure_usage", 0)
-        except Exception:
-            return 0
+            if data.get("month") == usage["month"]:
+                usage["azure_usage"] = data.get("azure_usage", 0)
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warn("Failed to read usage stats, starting from zero", error=str(e))
+        return usage
+
+    def _get_monthly_usage(self) -> int:
+        """Return current month's Azure usage from the in-memory counter."""
+        current_month = _current_month()
+        if self._usage_cache["month"] != current_month:
+            # Month rolled over: quota resets
+            self._usage_cache = {"month": current_month, "azure_usage": 0}
+        return self._usage_cache["azure_usage"]
 
     def _increment_usage(self, chars: int):
-        """Update Azure usage stats."""
+        """
+        Update Azure usage stats (written to disk in batches).
+        Kept synchronous on purpose: with no await between read and update,
+        concurrent generate() tasks cannot interleave here, so no lock is needed.
+        """
+        self._get_monthly_usage() # Apply month rollover before counting
+        self._usage_cache["azure_usage"] += chars
+        self._dirty_chars += chars
+        
+        if self._dirty_chars >= USAGE_FLUSH_THRESHOLD or time.monotonic() - self._last_flush >= USAGE_FLUSH_INTERVAL:
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        """Write usage from a worker thread when on the event loop, inline otherwise."""
         try:
-            current_usage = self._get_monthly_usage()
-            new_usage = current_usage + chars
-            
-            data = {
-                "month": datetime.now().strftime("%Y-%m"),
-                "azure_usage": new_usage
-            }
-            
-            with open(USAGE_FILE, 'w') as f:
-                json.dump(data, f)
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._flush_usage()
+            return
+        
+        if self._pending_flush is not None and not self._pending_flush.done():
+            return # A write is in progress; the next increment schedules another
+        
+        # Snapshot on the loop thread so the worker never sees a half-updated counter
+        snapshot = dict(self._usage_cache)
+        chars = self._dirty_chars
+        self._dirty_chars = 0
+        self._last_flush = time.monotonic()
+        
+        self._pending_flush = loop.run_in_executor(None, _write_usage_file, snapshot)
+        self._pending_flush.add_done_callback(lambda future: self._on_flush_done(future, chars))
+
+    def _on_flush_done(self, future: asyncio.Future, chars: int):
+        if future.cancelled() or future.exception() is not None:
+            self._dirty_chars += chars # Keep it pending for the next flush
+            if not future.cancelled():
+                logger.warn("Failed to update usage stats", error=str(future.exception()))
+
+    def _flush_usage(self):
+        """Persist the in-memory usage counter to USAGE_FILE synchronously (used at exit)."""
+        if not self._dirty_chars:
+            return
+        
+        try:
+            _write_usage_file(self._usage_cache)
+            self._dirty_chars = 0
+            self._last_flush = time.monotonic()
         except Exception as e:
             logger.warn("Failed to update usage stats", error=str(e))
 
-    def select_provider(self, segment_type: str, text: str, user_tier: str, emotion: str) -> str:
+    def _record_provider_result(self, provider_name: str, latency: float, ok: bool):
+        metrics = self._metrics[provider_name]
+        metrics["latency_ewma"] = (1 - PROVIDER_EWMA_ALPHA) * metrics["latency_ewma"] + PROVIDER_EWMA_ALPHA * latency
+        metrics["err_rate"] = (1 - PROVIDER_EWMA_ALPHA) * metrics["err_rate"] + PROVIDER_EWMA_ALPHA * (0.0 if ok else 1.0)
+        if not ok:
+            metrics["last_error"] = time.monotonic()
+
+    def _is_healthy(self, provider_name: str) -> bool:
+        """
+        False while the provider's error rate is above PROVIDER_MAX_ERROR_RATE and it failed recently.
+        After PROVIDER_ERROR_COOLDOWN it is tried again, so a recovered provider gets new samples.
+        """
+        metrics = self._metrics.get(provider_name)
+        if metrics is None or metrics["err_rate"] <= PROVIDER_MAX_ERROR_RATE:
+            return True
+        return time.monotonic() - metrics["last_error"] > PROVIDER_ERROR_COOLDOWN
+
+    def select_provider(self, segment_type: str, text: str, user_tier: str, emotion: str,
+                        azure_usage: Optional[int] = None) -> str:
         """
         Determine which provider to use based on Hybrid Routing rules.
         
@@ -429,56 +748,108 @@ class TTSManager:
         2. Narration:
            - VIP: OpenAI (High Quality)
            - Free: Azure (if quota) -> Google
+        Narration skips providers that are currently failing (see _is_healthy).
+        
+        azure_usage overrides the recorded monthly usage (used by plan() to
+        account for Azure segments already routed earlier in the same script).
         """
-        chars = len(text)
+        # Priority 1: Dialogue (fixed (type, tier) routes; other tiers fall through to Google)
+        provider_name = _FIXED_ROUTES.get((segment_type, user_tier))
+        if provider_name is not None:
+            return provider_name
         
-        # Priority 1: Dialogue
-        if segment_type == "dialogue":
-            if user_tier == "vip":
-                return "elevenlabs"
-            else:
-                # Free users get Google for dialogue
-                return "google"
+        chars = len(text)
 
         # Priority 2: Narration
         if segment_type == "narration":
             # Level 3: VIP User -> OpenAI
             if user_tier == "vip":
-                if self.providers["openai"].is_enabled:
+                if self.providers["openai"].is_enabled and self._is_healthy("openai"):
                     return "openai"
             
-            # Level 1: Azure (if quota allows)
-            usage = self._get_monthly_usage()
-            if usage + chars < AZURE_MONTHLY_LIMIT and self.providers["azure"].is_enabled:
-                return "azure"
+            # Level 1: Azure (if quota allows; usage comes from the in-memory counter)
+            if self.providers["azure"].is_enabled and self._is_healthy("azure"):
+                usage = self._get_monthly_usage() if azure_usage is None else azure_usage
+                if usage + chars < AZURE_MONTHLY_LIMIT:
+                    return "azure"
             
             # Level 2: Fallback to Google
-            if self.providers["google"].is_enabled:
+            if self.providers["google"].is_enabled and self._is_healthy("google"):
                 return "google"
                 
             # Fallback of Fallback
-            if self.providers["openai"].is_enabled:
+            if self.providers["openai"].is_enabled and self._is_healthy("openai"):
                 return "openai"
                 
         # Default fallback
         return "google"
 
-    def assign_voices_to_script(self, script: list, user_tier: str = "free", allowed_languages: list = None) -> list:
+    def plan(self, script: list, user_tier: str = "free") -> list:
+        """
+        Decide the provider for every segment in a single pass.
+        Narration is checked against a running Azure budget, so one script cannot
+        overshoot the monthly quota the way independent per-segment checks can.
+        Segments that already carry a voice_id keep that voice's provider.
+        """
+        usage = self._get_monthly_usage()
+        # Outside narration the choice only depends on (type, tier)
+        provider_by_route: Dict[Tuple[str, str], str] = {}
+        providers = []
+        
+        for segment in script:
+            text = segment["text"]
+            seg_type = segment["type"]
+            voice_id = segment.get("voice_id")
+            
+            if isinstance(voice_id, str) and voice_id.strip():
+                provider_name = _parse_voice_id(voice_id)[0]
+            elif seg_type == "narration":
+                provider_name = self.select_provider(seg_type, text, user_tier, segment.get("emotion", "neutral"), azure_usage=usage)
+            else:
+                route = (seg_type, user_tier)
+                provider_name = provider_by_route.get(route)
+                if provider_name is None:
+                    provider_name = self.select_provider(seg_type, text, user_tier, segment.get("emotion", "neutral"))
+                    provider_by_route[route] = provider_name
+            
+            if provider_name == "azure":
+                usage += len(text)
+            providers.append(provider_name)
+        
+        return providers
+
+    def assign_voices_to_script(self, script: list, user_tier: str = "free", allowed_languages: list = None,
+                                round_robin: Optional[bool] = None) -> list:
         """
         Enrich the script by pre-calculating and assigning voices and providers.
         This allows the frontend to see and edit the voice assignments.
+        round_robin (default: VOICE_ROUND_ROBIN) spreads characters over distinct pool voices
+        via assign_cast_voices instead of the per-name hash.
         """
-        for segment in script:
+        if round_robin is None:
+            round_robin = VOICE_ROUND_ROBIN
+        # Per-script memo: repeat characters reuse their first assignment
+        assigned: Dict[Tuple[str, str, str, str], Optional[str]] = {}
+        # Characters needing a voice, grouped by the pool they draw from (round-robin within each)
+        by_pool: Dict[Tuple[str, Tuple[str, ...]], list] = defaultdict(list)
+        # (segment, char_key) for segments written once voices are known
+        pending = []
+        providers = self.plan(script, user_tier)
+        
+        for segment, provider_name in zip(script, providers):
             text = segment["text"]
             character = segment.get("character", "Narrator")
-            seg_type = segment["type"]
-            emotion = segment.get("emotion", "neutral")
             gender = segment.get("gender", "male")
             
+            # Check for Manual Voice Override
+            manual_voice = segment.get("voice_id")
+            if manual_voice and isinstance(manual_voice, str) and manual_voice.strip():
+                 # 1.1 If manual voice exists and is valid, preserve it!
+                 # We don't overwrite it with auto-assignment.
+                 continue
+            
             # Detect language (needed for voice selection)
-            import re
-            is_chinese = bool(re.search(r'[\u4e00-\u9fff]', text))
-            lang_key = "zh" if is_chinese else "en"
+            lang_key = _detect_lang_key(text)
             
             # Filter Logic: Restrict to allowed_languages if provided
             if allowed_languages and lang_key not in allowed_languages:
@@ -488,135 +859,181 @@ class TTSManager:
                 elif allowed_languages:
                     lang_key = allowed_languages[0] # Fallback to first allowed
             
-            # Check for Manual Voice Override
-            manual_voice = segment.get("voice_id")
-            if manual_voice and manual_voice != "" and isinstance(manual_voice, str) and manual_voice.strip():
-                 # 1.1 If manual voice exists and is valid, preserve it!
-                 # Still might need to set provider for metadata if missing
-                 # But we don't overwrite it with auto-assignment.
-                 pass 
-            else:
-                # 1. Determine Provider
-                provider_name = self.select_provider(seg_type, text, user_tier, emotion)
-                
-                # 2. Determine Voice ID
+            # 1. Provider comes from the script-wide plan (provider_name)
+            char_key = (character, gender, provider_name, lang_key)
+            if char_key not in assigned:
+                assigned[char_key] = None
+                by_pool[(provider_name, _voice_pool(gender, provider_name, lang_key))].append(char_key)
+            pending.append((segment, char_key))
+        
+        # 2. Determine Voice IDs (round-robin: distinct pool voices until the pool is exhausted)
+        for (provider_name, pool), char_keys in by_pool.items():
+            rotation = assign_cast_voices([key[0] for key in char_keys], pool) if round_robin else {}
+            for char_key in char_keys:
+                character, gender, _, lang_key = char_key
+                if character in rotation:
+                    assigned[char_key] = f"{provider_name}:{rotation[character]}"
+                    continue
                 specific_voice_id = self._get_consistent_voice(character, gender, provider_name, lang=lang_key)
                 
                 # Fallback for Google/Azure if specific_voice_id is None
                 if not specific_voice_id:
                     if provider_name == "google":
-                        voice_dict = VOICE_MAP["google"][lang_key]
-                        raw_id = voice_dict.get(gender, list(voice_dict.values())[0])
+                        raw_id = VOICE_MAP["google"][lang_key].get(gender) or _GOOGLE_FALLBACK[lang_key]
                         specific_voice_id = f"google:{raw_id}"
                     elif provider_name == "azure":
                         raw_id = VOICE_MAP["azure"][lang_key]
                         specific_voice_id = f"azure:{raw_id}"
                     elif provider_name == "openai":
-                        specific_voice_id = VOICE_MAP["openai"]["male"] if gender == "male" else VOICE_MAP["openai"]["female"]
-
-                # 3. Write to Segment
-                segment["voice_id"] = specific_voice_id
+                        specific_voice_id = _OPENAI_VOICE["male" if gender == "male" else "female"]
+                assigned[char_key] = specific_voice_id
+        
+        # 3. Write to Segments
+        for segment, char_key in pending:
+            segment["voice_id"] = assigned[char_key]
             
         return script
 
+    async def _throttle(self, provider_name: str):
+        """Wait for a request slot if the provider has a rate limit configured."""
+        limiter = self._provider_limiters.get(provider_name)
+        if limiter is not None:
+            await limiter.acquire()
+
+    def _resolve_segment_voice(self, segment: Dict) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Resolve (provider_name, voice_id) for a segment from its assigned fields.
+        Either value is None if the segment has no usable voice assignment.
+        """
+        # 1. Try to get pre-assigned provider/voice (WYSIWYG)
+        provider_name = segment.get("provider")
+        specific_voice_id = segment.get("voice_id")
+        
+        # 2. Have voice_id but no provider (assigned namespaced ID, Manual Override / Review)
+        # Empty string means the frontend passed the script back without assigning a specific voice.
+        if specific_voice_id and not provider_name:
+            provider_name, specific_voice_id = _parse_voice_id(specific_voice_id)
+
+        return provider_name, specific_voice_id
+
     async def generate(self, segment: Dict, output_file: str, user_tier: str = "free", elevenlabs_key: str = None) -> None:
         text = segment["text"]
         character = segment.get("character", "Narrator")
         emotion = segment.get("emotion", "neutral")
-        gender = segment.get("gender", "male")
         pacing = float(segment.get("pacing", 1.0))
         
-        # 1. Try to get pre-assigned provider/voice (WYSIWYG)
-        provider_name = segment.get("provider")
-        specific_voice_id = segment.get("voice_id")
+        provider_name, specific_voice_id = self._resolve_segment_voice(segment)
         
-        # New: Parse namespaced ID (e.g. google:en-US-Neural2-A)
-        # This takes precedence over separate fields
-        if specific_voice_id and ":" in specific_voice_id and not provider_name:
-            p_candidate, v_candidate = specific_voice_id.split(":", 1)
-            # Basic validation to ensure it looks like a provider
-            if p_candidate in ["google", "azure", "openai", "elevenlabs"]:
-                provider_name = p_candidate
-                specific_voice_id = v_candidate
-        
-        # 2. If missing or empty, calculate them (Legacy Path / Fallback)
-        # Empty string means the frontend passed the script back without assigning a specific voice,
-        # so we must calculate a deterministic voice on the fly.
-        # 2. If missing or empty, calculate them (Legacy Path / Fallback)
-        # Empty string means the frontend passed the script back without assigning a specific voice,
-        # so we must calculate a deterministic voice on the fly.
         if not provider_name or not specific_voice_id:
-             # Case 2a: Have voice_id but no provider (e.g. Manual Override / Review)
-             if specific_voice_id and not provider_name:
-                 # Infer provider from voice ID pattern
-                 if "Neural2" in specific_voice_id or "Wavenet" in specific_voice_id:
-                     provider_name = "google"
-                 elif "Neural" in specific_voice_id: # Azure usually ends in Neural
-                     provider_name = "azure"
-                 elif specific_voice_id in ["onyx", "alloy", "shimmer", "echo", "fable", "nova"]:
-                     provider_name = "openai"
-                 elif len(specific_voice_id) > 15: # ElevenLabs IDs are ~20 chars
-                     provider_name = "elevenlabs"
-                 else:
-                     # Fallback to default calculation if unknown
-                     pass
-
-             # Case 2b: Still missing provider or voice_id
-             if not provider_name or not specific_voice_id:
-                 logger.warn("Skipping generation: No voice assigned", segment_text=text[:20])
-                 return
+            logger.warn("Skipping generation: No voice assigned", segment_text=text[:20])
+            return
 
         # Determine emotion settings
         
         # Determine emotion settings
         settings = EMOTION_SETTINGS.get(emotion.lower(), EMOTION_SETTINGS["neutral"])
         
-        logger.info("Routing TTS request", 
+        logger.debug("Routing TTS request", 
             text_snippet=text[:15], 
             provider=provider_name, 
             user_tier=user_tier, 
             voice=specific_voice_id or 'Default', 
             settings=settings, 
+            pacing=pacing,
+            provider_health=self._metrics.get(provider_name)
+        )
+        
+        # Serve repeated requests from the audio cache (settings only affect ElevenLabs)
+        cache_key = make_cache_key(
+            provider_name,
+            specific_voice_id,
+            text,
+            settings=settings if provider_name == "elevenlabs" else None,
             pacing=pacing
         )
+        if await audio_cache.fetch_async(cache_key, output_file):
+            logger.info("TTS cache hit", text_snippet=text[:15], provider=provider_name, voice=specific_voice_id)
+            return
         
-        # Execute based on provider
-        if provider_name == "azure":
-            # specific_voice_id from _get_consistent_voice might be None or correct
-            # For Azure, let's trust _get_consistent_voice returned the map value
-            if not specific_voice_id:
-                 specific_voice_id = VOICE_MAP["azure"][lang_key]
-            
-            await self.providers["azure"].generate(text, output_file, specific_voice_id, speed=pacing)
-            self._increment_usage(len(text))
-            
-        elif provider_name == "google":
-            # Ensure specific_voice_id is set (from pool)
-            if not specific_voice_id:
-                 # Fallback if hash failed
-                 voice_dict = VOICE_MAP["google"][lang_key]
-                 specific_voice_id = voice_dict.get(gender, list(voice_dict.values())[0])
-            
-            await self.providers["google"].generate(text, output_file, specific_voice_id, speed=pacing)
-            
-        elif provider_name == "openai":
-            # specific_voice_id should be 'onyx' or 'alloy'
-            if not specific_voice_id:
-                 specific_voice_id = VOICE_MAP["openai"]["male"] if gender == "male" else VOICE_MAP["openai"]["female"]
-                 
-            await self.providers["openai"].generate(text, output_file, specific_voice_id, speed=pacing)
-            
-        elif provider_name == "elevenlabs":
-            await self.providers["elevenlabs"].generate(
-                text=text,
-                output_file=output_file,
-                voice=specific_voice_id,
-                api_key=elevenlabs_key,
-                settings=settings
-            )
-            
-        else:
+        # Single-flight: an identical request already being generated (e.g. a line repeated
+        # within the script) is awaited and served from the cache instead of paid for twice
+        while audio_cache.enabled and (pending := self._pending_generations.get(cache_key)) is not None:
+            # The future is shared by every waiter: shield it so cancelling one follower
+            # doesn't cancel it for the leader and the other followers
+            await asyncio.shield(pending)
+            if await audio_cache.fetch_async(cache_key, output_file):
+                logger.info("TTS cache hit", text_snippet=text[:15], provider=provider_name, voice=specific_voice_id)
+                return
+        
+        # Without the cache there is nothing to share, so identical requests just run independently
+        done = None
+        if audio_cache.enabled:
+            done = asyncio.get_running_loop().create_future()
+            self._pending_generations[cache_key] = done
+        try:
+            await self._synthesize(provider_name, specific_voice_id, text, output_file, pacing, settings, elevenlabs_key)
+            await audio_cache.store_async(cache_key, output_file)
+        finally:
+            if done is not None:
+                if self._pending_generations.get(cache_key) is done:
+                    del self._pending_generations[cache_key]
+                # Guard as well: a cancelled future would make set_result raise here
+                # and mask the leader's real outcome
+                if not done.done():
+                    done.set_result(None)
+
+    async def _gen_azure(self, text: str, output_file: str, voice_id: str, pacing: float, settings: Dict, elevenlabs_key: Optional[str]):
+        await self.providers["azure"].generate(text, output_file, voice_id, speed=pacing)
+        self._increment_usage(len(text))
+
+    async def _gen_google(self, text: str, output_file: str, voice_id: str, pacing: float, settings: Dict, elevenlabs_key: Optional[str]):
+        await self.providers["google"].generate(text, output_file, voice_id, speed=pacing)
+
+    async def _gen_openai(self, text: str, output_file: str, voice_id: str, pacing: float, settings: Dict, elevenlabs_key: Optional[str]):
+        await self.providers["openai"].generate(text, output_file, voice_id, speed=pacing)
+
+    async def _gen_elevenlabs(self, text: str, output_file: str, voice_id: str, pacing: float, settings: Dict, elevenlabs_key: Optional[str]):
+        await self.providers["elevenlabs"].generate(
+            text=text,
+            output_file=output_file,
+            voice=voice_id,
+            api_key=elevenlabs_key,
+            settings=settings
+        )
+
+    async def _synthesize(self, provider_name: str, specific_voice_id: str, text: str, output_file: str,
+                          pacing: float, settings: Dict, elevenlabs_key: Optional[str]) -> None:
+        """Call the provider, bounded by its semaphore / rate limit and recorded in its health metrics."""
+        # Execute based on provider (bounded per provider to stay under rate limits)
+        semaphore = self._provider_semaphores.get(provider_name)
+        if semaphore is None:
             raise Exception(f"Unknown or unsupported provider: {provider_name}")
+        
+        async with semaphore:
+            await self._throttle(provider_name)
+            started = time.monotonic()
+            try:
+                await self._dispatch[provider_name](text, output_file, specific_voice_id, pacing, settings, elevenlabs_key)
+            except Exception:
+                self._record_provider_result(provider_name, time.monotonic() - started, ok=False)
+                raise
+            else:
+                self._record_provider_result(provider_name, time.monotonic() - started, ok=True)
+
+    async def generate_batch(self, segments: list, output_files: list, user_tier: str = "free", elevenlabs_key: str = None) -> list:
+        """
+        Generate audio for many segments concurrently.
+        Each call is bounded by its provider's semaphore inside generate(), so mixed-provider
+        scripts run in parallel without exceeding any single provider's concurrency limit.
+        
+        Returns:
+            list: One entry per segment (None on success, or the raised exception)
+        """
+        tasks = [
+            self.generate(segment, output_file, user_tier=user_tier, elevenlabs_key=elevenlabs_key)
+            for segment, output_file in zip(segments, output_files)
+        ]
+        return await asyncio.gather(*tasks, return_exceptions=True)
 
 
 # Singleton Manager
@@ -636,20 +1053,28 @@ async def generate_segment_audio(
     """
     Wrapper for TTSManager to maintain compatibility with main.py
     """
-    segment_type = segment["type"]
-    character = segment["character"]
-    text = segment["text"]
-    
     # Ensure output directory exists
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
     
+    return await _generate_segment_file(segment, output_path, elevenlabs_api_key, user_tier)
+
+
+async def _generate_segment_file(
+    segment: Dict,
+    output_path: Path,
+    elevenlabs_api_key: str = None,
+    user_tier: str = "free"
+) -> str:
+    """Generate one segment into an existing output directory."""
+    segment_type = segment["type"]
+    character = segment["character"]
+    text = segment["text"]
+    
     # Generate unique filename
-    import hashlib
-    import time
-    timestamp = int(time.time() * 1000)
-    text_hash = hashlib.md5(text.encode()).hexdigest()[:8]
-    filename = f"{segment_type}_{character}_{timestamp}_{text_hash}.mp3"
+    seq = next(_segment_counter)
+    text_hash = hashlib.blake2b(text.encode(), digest_size=4).hexdigest() # 8 hex chars, no slicing
+    filename = f"{segment_type}_{character}_{seq}_{text_hash}.mp3"
     output_file = output_path / filename
     
     # Use Manager
@@ -683,17 +1108,21 @@ async def generate_script_audio(
     Returns:
         list: List of paths to generated audio files (in same order as script)
     """
+    # Create the output directory once for the whole script
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    
     tasks = []
     for segment in script:
-        task = generate_segment_audio(
+        task = _generate_segment_file(
             segment=segment, 
-            output_dir=output_dir, 
+            output_path=output_path, 
             elevenlabs_api_key=elevenlabs_api_key,
             user_tier=user_tier
         )
         tasks.append(task)
     
-    # Generate all audio files concurrently
+    # Generate all audio files concurrently (API calls are bounded per provider in TTSManager.generate)
     audio_paths = await asyncio.gather(*tasks)
     
     return audio_paths
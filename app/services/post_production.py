@@ -7,6 +7,9 @@ import os
 from pathlib import Path
 from typing import List, Dict, Tuple
 from pydub import AudioSegment
+import structlog
+
+logger = structlog.get_logger(__name__)
 
 # ========================================
 # Configure ffmpeg for Vercel/Serverless
@@ -139,10 +142,10 @@ def merge_audio_and_generate_srt(segments: List[Dict], temp_dir: str) -> Tuple[s
         
         # Load the audio segment
         try:
-            print(f"🔍 Loading audio file: {audio_file_path}")
+            logger.debug("Loading audio file", path=audio_file_path)
             audio_segment = AudioSegment.from_file(audio_file_path)
         except Exception as e:
-            print(f"❌ Failed to load audio file: {e}")
+            logger.error("Failed to load audio file", path=audio_file_path, error=str(e))
             raise Exception(f"Failed to load audio file {audio_file_path}: {str(e)}")
         
         # Apply pacing adjustment if specified
@@ -150,7 +153,7 @@ def merge_audio_and_generate_srt(segments: List[Dict], temp_dir: str) -> Tuple[s
             try:
                 audio_segment = apply_pacing(audio_segment, pacing)
             except Exception as e:
-                print(f"Warning: Failed to apply pacing {pacing} to segment {idx}: {e}")
+                logger.warn("Failed to apply pacing", pacing=pacing, segment=idx, error=str(e))
         
         # Add silence gap before this segment (except for the first segment)
         if idx > 1:
@@ -187,7 +190,7 @@ def merge_audio_and_generate_srt(segments: List[Dict], temp_dir: str) -> Tuple[s
     # Export final audio
     final_audio_path = output_path / "final.mp3"
     try:
-        print(f"🔍 Exporting final audio to: {final_audio_path}")
+        logger.info("Exporting final audio", path=str(final_audio_path))
         final_audio.export(
             final_audio_path,
             format="mp3",
@@ -198,9 +201,9 @@ def merge_audio_and_generate_srt(segments: List[Dict], temp_dir: str) -> Tuple[s
                 "genre": "Audio Drama"
             }
         )
-        print(f"✅ Exported final audio successfully")
+        logger.info("Exported final audio successfully")
     except Exception as e:
-        print(f"❌ Failed to export final audio: {e}")
+        logger.error("Failed to export final audio", error=str(e))
         raise Exception(f"Failed to export final audio: {str(e)}")
     
     # Export SRT subtitles
@@ -3,14 +3,13 @@ import asyncio
 import zipfile
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional
-import re
 import json
 import structlog
 
 logger = structlog.get_logger(__name__)
 
 
-from .audio_engine import generate_segment_audio, generate_cast_metadata
+from .audio_engine import generate_segment_audio, generate_cast_metadata, is_chinese
 
 from uuid import uuid4
 from .post_production import merge_audio_and_generate_srt
@@ -39,11 +38,8 @@ async def synthesize_drama(
     audio_dir = os.path.join(temp_dir, "audio")
     os.makedirs(audio_dir, exist_ok=True)
     
-    # Extract full text for language detection (rough approximation from script)
-    full_text = " ".join([s["text"] for s in script])
-    
-    # Step 0: Detect language for narrator
-    has_chinese = bool(re.search(r'[\u4e00-\u9fff]', full_text))
+    # Step 0: Detect language for narrator (stops at the first segment with Chinese text)
+    has_chinese = any(is_chinese(s["text"]) for s in script)
     if has_chinese:
         narrator_voice = "zh-CN-YunxiNeural"
         logger.info("Detected Chinese contents", voice=narrator_voice)
@@ -86,21 +82,15 @@ async def synthesize_drama(
     logger.info("Starting Phase 2: Dialogue", provider="ElevenLabs")
     
     if dialogue_items:
-        # ElevenLabs concurrency limit
-        semaphore = asyncio.Semaphore(3)
-        
-        async def generate_dialogue_with_limit(segment):
-            async with semaphore:
-                return await generate_segment_audio(
-                    segment=segment,
-                    output_dir=audio_dir,
-                    elevenlabs_api_key=elevenlabs_key,
-                    narration_voice=narrator_voice,
-                    user_tier=user_tier
-                )
-        
+        # Concurrency is bounded per provider inside the TTS manager (PROVIDER_CONCURRENCY)
         dialogue_tasks = [
-            generate_dialogue_with_limit(seg) for _, seg in dialogue_items
+            generate_segment_audio(
+                segment=seg,
+                output_dir=audio_dir,
+                elevenlabs_api_key=elevenlabs_key,
+                narration_voice=narrator_voice,
+                user_tier=user_tier
+            ) for _, seg in dialogue_items
         ]
         
         try:
@@ -1,6 +1,10 @@
 
 import os
+import atexit
 import asyncio
+import random
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from abc import ABC, abstractmethod
 from typing import Optional, Dict
 import structlog
@@ -32,6 +36,57 @@ except ImportError:
     ElevenLabs = None
     VoiceSettings = None
 
+# Write buffer for chunked ElevenLabs audio (SDK chunks are a few KB each);
+# larger than a typical segment's MP3, so most files are written in a single syscall
+AUDIO_WRITE_BUFFER_SIZE = 512 * 1024
+
+# ElevenLabs retry policy: only rate limits / server errors are retried
+ELEVENLABS_RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+ELEVENLABS_BACKOFF_BASE = 1.0 # seconds
+ELEVENLABS_BACKOFF_MAX = 60.0 # seconds
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """Read a Retry-After header (in seconds) from an SDK error, if present."""
+    headers = getattr(error, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+# Dedicated workers for blocking ElevenLabs calls, so long downloads don't
+# starve the executor shared with Azure/Google
+_ELEVENLABS_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("ELEVENLABS_MAX_WORKERS", "8")),
+    thread_name_prefix="elevenlabs"
+)
+atexit.register(_ELEVENLABS_EXECUTOR.shutdown, wait=False)
+
+# Workers for the blocking Azure/Google SDK calls. Sized for their combined
+# per-provider concurrency, which the default executor (cpu_count + 4) caps on small hosts
+_SDK_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("TTS_SDK_MAX_WORKERS", "32")),
+    thread_name_prefix="tts-sdk"
+)
+atexit.register(_SDK_EXECUTOR.shutdown, wait=False)
+
+@functools.lru_cache(maxsize=16)
+def _get_elevenlabs_client(api_key: str):
+    """One ElevenLabs client per API key, so its HTTP connection pool is reused across calls."""
+    return ElevenLabs(api_key=api_key)
+
+@functools.lru_cache(maxsize=32)
+def _get_voice_settings(stability: float, similarity_boost: float, style: float):
+    """Shared VoiceSettings per distinct preset (there are only a handful of emotion presets)."""
+    return VoiceSettings(
+        stability=stability,
+        similarity_boost=similarity_boost,
+        style=style,
+        use_speaker_boost=True
+    )
+
 class TTSProvider(ABC):
     """Abstract base class for TTS providers."""
     
@@ -98,7 +153,7 @@ class AzureTTSProvider(TTSProvider):
         # Synthesize (blocking call, need to wrap in executor)
         loop = asyncio.get_event_loop()
         result = await loop.run_in_executor(
-            None,
+            _SDK_EXECUTOR,
             lambda: synthesizer.speak_text_async(text).get()
         )
         
@@ -158,7 +213,7 @@ class GoogleTTSProvider(TTSProvider):
         # Async call wrapper
         loop = asyncio.get_event_loop()
         response = await loop.run_in_executor(
-            None,
+            _SDK_EXECUTOR,
             lambda: client.synthesize_speech(
                 input=synthesis_input, 
                 voice=voice_params, 
@@ -230,6 +285,22 @@ class ElevenLabsTTSProvider(TTSProvider):
     @property
     def is_enabled(self) -> bool:
         return self._enabled
+    
+    @staticmethod
+    def _synthesize_to_file(client, text: str, voice: str, v_settings, output_file: str) -> None:
+        # Note: ElevenLabs Python SDK generate returns generator or bytes.
+        # The 'convert' method is correct for V3 SDK.
+        audio_generator = client.text_to_speech.convert(
+            voice_id=voice,
+            text=text,
+            model_id="eleven_turbo_v2_5",
+            voice_settings=v_settings
+        )
+        
+        # Consume generator and write to file (buffered so small chunks coalesce into large writes)
+        with open(output_file, "wb", buffering=AUDIO_WRITE_BUFFER_SIZE) as f:
+            for chunk in audio_generator:
+                f.write(chunk)
         
     async def generate(self, text: str, output_file: str, voice: str, speed: float = 1.0, **kwargs) -> None:
         if not self._enabled:
@@ -242,16 +313,15 @@ class ElevenLabsTTSProvider(TTSProvider):
         settings_dict = kwargs.get("settings")
         max_retries = kwargs.get("max_retries", 3)
         
-        client = ElevenLabs(api_key=api_key)
+        client = _get_elevenlabs_client(api_key)
         
         # Prepare settings
         v_settings = None
         if settings_dict:
-            v_settings = VoiceSettings(
-                stability=settings_dict.get("stability", 0.5),
-                similarity_boost=settings_dict.get("similarity_boost", 0.75),
-                style=settings_dict.get("style", 0.0),
-                use_speaker_boost=True
+            v_settings = _get_voice_settings(
+                settings_dict.get("stability", 0.5),
+                settings_dict.get("similarity_boost", 0.75),
+                settings_dict.get("style", 0.0)
             )
             
         for attempt in range(max_retries):
@@ -259,25 +329,26 @@ class ElevenLabsTTSProvider(TTSProvider):
                 if attempt > 0:
                     logger.warn("ElevenLabs retry attempt", attempt=attempt+1, max_retries=max_retries)
                     
-                # Note: ElevenLabs Python SDK generate returns generator or bytes.
-                # The 'convert' method is correct for V3 SDK.
-                audio_generator = client.text_to_speech.convert(
-                    voice_id=voice,
-                    text=text,
-                    model_id="eleven_turbo_v2_5",
-                    voice_settings=v_settings
+                # The SDK call and its chunk generator are blocking: run both in one
+                # executor call so the event loop stays free while audio downloads
+                loop = asyncio.get_event_loop()
+                await loop.run_in_executor(
+                    _ELEVENLABS_EXECUTOR,
+                    lambda: self._synthesize_to_file(client, text, voice, v_settings, output_file)
                 )
                 
-                # Consume generator and write to file
-                with open(output_file, "wb") as f:
-                    for chunk in audio_generator:
-                        f.write(chunk)
-                        
                 return # Success
                 
             except Exception as e:
+                # Errors without a status code (timeouts, dropped connections) are treated as transient
+                status = getattr(e, "status_code", None)
+                if status is not None and status not in ELEVENLABS_RETRY_STATUSES:
+                    raise Exception(f"ElevenLabs generation failed ({status}): {str(e)}")
                 if attempt == max_retries - 1:
                     raise Exception(f"ElevenLabs generation failed after {max_retries} attempts: {str(e)}")
-                # Exponential backoff? 
-                # For now just simple retry as per original logic.
-                await asyncio.sleep(1)
+                
+                # Honor Retry-After, else exponential backoff with jitter
+                delay = _retry_after_seconds(e)
+                if delay is None:
+                    delay = ELEVENLABS_BACKOFF_BASE * 2 ** attempt + random.random()
+                await asyncio.sleep(min(delay, ELEVENLABS_BACKOFF_MAX))